@@ -1,9 +1,17 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import yfinance as yf
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots 
 import datetime
+import io
+import time
+import tempfile
+from pathlib import Path
+from zoneinfo import ZoneInfo
+import requests
+from requests.adapters import HTTPAdapter
 
 # -----------------------------------------------------------------------------
 # 1. 페이지 기본 설정 & 스타일
@@ -14,38 +22,37 @@ st.set_page_config(
     layout="wide"
 )
 
-# 커스텀 CSS (카드 디자인)
+# 커스텀 CSS (코드 블록 줄바꿈 + 지표 그리드 레이아웃)
 st.markdown("""
 <style>
-    /* 카드 디자인 */
-    .metric-card {
-        background-color: #f9f9f9;
-        padding: 15px;
-        border-radius: 10px;
-        box-shadow: 2px 2px 5px rgba(0,0,0,0.1);
-    }
-    
     /* 코드 블록 줄바꿈 */
     div[data-testid="stCodeBlock"] pre {
         white-space: pre-wrap !important;
         word-break: break-word !important;
     }
 
-    /* 📱 모바일 최적화: CSS Grid를 사용한 강력한 2열 강제 */
-    @media (max-width: 640px) {
-        /* 컬럼들을 감싸는 컨테이너를 Grid 모드로 변경 */
-        div[data-testid="stHorizontalBlock"] {
-            display: grid !important;
-            grid-template-columns: 1fr 1fr !important; /* 1:1 비율로 2개 강제 */
-            gap: 10px !important;
-            flex-direction: row !important; /* 기존 세로 정렬 무시 */
-        }
+    /* 🖥️ 지표 8개 컬럼 블록만 CSS Grid로 4열 x 2줄 배치 (다른 st.columns에는 적용 안 됨) */
+    .st-key-metric_grid div[data-testid="stHorizontalBlock"] {
+        display: grid !important;
+        grid-template-columns: repeat(4, 1fr) !important; /* 1줄에 4개 */
+        gap: 10px !important;
+        row-gap: 30px !important; /* 두 줄 사이 간격 */
+        flex-direction: row !important; /* 기존 세로 정렬 무시 */
+    }
+
+    /* 개별 컬럼의 너비 강제 초기화 */
+    .st-key-metric_grid div[data-testid="column"],
+    .st-key-metric_grid div[data-testid="stColumn"] {
+        width: auto !important;
+        flex: 1 1 auto !important;
+        min-width: 0 !important; /* 내용이 넘쳐도 깨지지 않게 방지 */
+    }
 
-        /* 개별 컬럼의 너비 강제 초기화 */
-        div[data-testid="column"] {
-            width: auto !important;
-            flex: 1 1 auto !important;
-            min-width: 0 !important; /* 내용이 넘쳐도 깨지지 않게 방지 */
+    /* 📱 모바일 최적화: 같은 블록을 2열로 강제 */
+    @media (max-width: 640px) {
+        .st-key-metric_grid div[data-testid="stHorizontalBlock"] {
+            grid-template-columns: repeat(2, 1fr) !important; /* 1:1 비율로 2개 강제 */
+            row-gap: 10px !important;
         }
         
         /* 텍스트 크기 등 미세 조정 (선택사항) */
@@ -63,63 +70,214 @@ st.divider()
 # 2. 데이터 수집 및 차트 생성 함수들
 # -----------------------------------------------------------------------------
 
+# (0) 데이터 종류별 캐시 유지 시간(초)
+CACHE_TTL = {
+    "equity_live": 600,       # 장중 갱신 주기: 10분
+    "equity_closed": 43200,   # 주식 캐시 최대 유지 시간: 12시간 (장 시작/마감 시에는 키가 바뀌어 새로 받음)
+    "fred_daily": 3600,       # FRED 일간 지표 (DGS10): 1시간
+    "fred_monthly": 86400,    # FRED 월간 지표 (CPI, 실업률): 24시간
+}
+
+def smart_ttl(kind):
+    return CACHE_TTL[kind]
+
+# 시장별 정규장 시간 (현지 시각 기준, 평일만)
+MARKET_SESSIONS = {
+    "US": ("America/New_York", datetime.time(9, 30), datetime.time(16, 0)),
+    "KR": ("Asia/Seoul", datetime.time(9, 0), datetime.time(15, 30)),
+    "JP": ("Asia/Tokyo", datetime.time(9, 0), datetime.time(15, 30)),
+    "24H": ("America/New_York", datetime.time(0, 0), datetime.time.max),  # 환율/선물: 평일 내내 거래
+}
+
+# 티커별 시장 (없으면 미국 시장)
+TICKER_MARKET = {
+    "KRW=X": "24H",
+    "^N225": "JP",
+    "^KS11": "KR",
+    "GC=F": "24H",
+    "SI=F": "24H",
+}
+
+# 시장의 현지 날짜와 구간 (pre: 개장 전, open: 장중, post: 마감 후, closed: 주말)
+def market_phase(market):
+    tz_name, open_time, close_time = MARKET_SESSIONS[market]
+    now = datetime.datetime.now(tz=ZoneInfo(tz_name))
+    if now.weekday() >= 5:
+        phase = "closed"
+    elif now.time() < open_time:
+        phase = "pre"
+    elif now.time() < close_time:
+        phase = "open"
+    else:
+        phase = "post"
+    return now.date().isoformat(), phase
+
+# 주식 캐시 키: 시장별 (시장, 현지 날짜, 구간) + 장중이면 10분 단위 갱신 슬롯
+# -> 개장/마감/날짜가 바뀌면 키가 달라져서 이전 구간의 데이터를 다시 쓰지 않음
+def market_session_key(*tickers):
+    markets = sorted({TICKER_MARKET.get(t, "US") for t in tickers})
+    key = tuple((m, *market_phase(m)) for m in markets)
+    if any(phase == "open" for _, _, phase in key):
+        key += (int(time.time() // smart_ttl("equity_live")),)
+    return key
+
 # (1) 데일리 데이터 함수 (수정됨: ^TNX 차단 시 FRED로 우회)
-@st.cache_data(ttl=3600)
 def get_daily_data(ticker, period="6mo"):
+    # 티커 대소문자/공백이 달라도 같은 캐시를 쓰도록 여기서 한 번만 정규화
+    ticker = ticker.strip().upper()
     # 🌟 [수정 포인트] 미국 10년물 금리(^TNX)는 클라우드에서 야후 차단이 심하므로 FRED 공식 데이터(DGS10) 사용
+    # (주식 캐시를 거치지 않고 FRED 일간 TTL로만 캐시)
     if ticker == "^TNX":
-        # FRED에서 DGS10(일일 10년물 금리) 가져오기
-        df = get_macro_data("DGS10")
-        if df is None or df.empty:
-            return None, None, None
-        
-        # 데이터 정리 (FRED는 가끔 '.' 같은 문자가 섞임 -> 숫자 변환)
-        series = df['DGS10'].dropna().astype(float)
-        
-        last_price = series.iloc[-1]
-        prev_price = series.iloc[-2]
-        delta = last_price - prev_price
-        
-        return last_price, delta, series
+        return get_treasury_data()
 
     # 나머지 일반 주식/환율 등은 기존대로 야후 파이낸스 사용
+    return get_yahoo_daily_data(ticker, market_session_key(ticker), period)
+
+@st.cache_data(ttl=smart_ttl("fred_daily"))
+def get_treasury_data():
+    # FRED에서 DGS10(일일 10년물 금리) 가져오기
+    df = fetch_fred_data("DGS10")
+    if df is None or df.empty:
+        return None, None, None
+    
+    # FRED의 '.' 결측치는 읽을 때 이미 NaN(float)으로 처리됨
+    series = df['DGS10'].dropna()
+    
+    close = series.to_numpy()
+    last_price = float(close[-1])
+    prev_price = float(close[-2])
+    delta = last_price - prev_price
+    
+    return last_price, delta, series
+
+# session_key는 캐시 키 전용 (market_session_key 참고), 캐시 개수 제한
+@st.cache_data(ttl=smart_ttl("equity_closed"), max_entries=64)
+def get_yahoo_daily_data(ticker, session_key, period="6mo"):
+    # (download 대신 Ticker.history: 단일 티커라 Close가 바로 1차원 Series로 나옴)
     try:
-        df = yf.download(ticker, period=period, progress=False, auto_adjust=True)
-        if df.empty:
+        df = yf.Ticker(ticker).history(period=period, auto_adjust=True)
+        if len(df) < 2:
             return None, None, None
         
-        last_price = df['Close'].iloc[-1].item()
-        prev_price = df['Close'].iloc[-2].item()
+        # history()는 거래소 시간대가 붙은 인덱스를 반환 -> yf.download처럼 현지 날짜 그대로(naive) 맞춤
+        # (안 그러면 차트에서 UTC로 바뀌어 아시아 지수가 하루 전 날짜로 표시됨)
+        df.index = df.index.tz_localize(None)
+        
+        # 판다스 인덱서 대신 numpy 배열에서 바로 꺼내기
+        close = df['Close'].to_numpy(copy=False)
+        last_price = float(close[-1])
+        prev_price = float(close[-2])
         delta = last_price - prev_price
         
         return last_price, delta, df['Close']
     except Exception as e:
         return None, None, None
 
-# (2) 월간 매크로 데이터 (기간 확대)
-@st.cache_data(ttl=86400) 
-def get_macro_data(series_id):
+# (1-1) 데일리 데이터 일괄 다운로드 (티커별 개별 요청 대신 한 번에 병렬로 받기)
+# session_key는 캐시 키 전용 (market_session_key 참고)
+@st.cache_data(ttl=smart_ttl("equity_closed"), max_entries=16)
+def get_bulk_daily(tickers_tuple, session_key, period="6mo"):
+    try:
+        df = yf.download(
+            list(tickers_tuple), period=period, group_by='ticker',
+            threads=True, progress=False, auto_adjust=True
+        )
+        if df.empty:
+            return None
+        return df
+    except Exception as e:
+        return None
+
+# (1-2) 일괄 다운로드 결과에서 티커 하나의 (현재가, 변동폭, 종가 시계열) 꺼내기
+def split_daily_data(bulk_df, ticker):
+    if bulk_df is None or ticker not in bulk_df.columns.get_level_values(0):
+        return None, None, None
+
+    # 티커마다 휴장일이 달라서 생기는 빈 칸 제거
+    close = bulk_df[ticker]['Close'].dropna()
+    if len(close) < 2:
+        return None, None, None
+
+    close_vals = close.to_numpy(copy=False)
+    last_price = float(close_vals[-1])
+    prev_price = float(close_vals[-2])
+    delta = last_price - prev_price
+
+    return last_price, delta, close
+
+# (2) FRED 데이터 (기간 확대) - 월간/일간 지표의 캐시 시간만 다르게
+# 파싱한 결과를 디스크에 Parquet으로 저장해두고, 서버 데이터가 바뀌었을 때만 다시 받기
+FRED_CACHE_DIR = Path(tempfile.gettempdir())
+
+# FRED 요청끼리 TCP/TLS 연결을 재사용하도록 세션 하나를 앱 전체에서 공유 (재실행해도 유지)
+@st.cache_resource
+def get_http_session():
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+    return session
+
+def get_fred_last_modified(url):
+    try:
+        r = get_http_session().head(url, timeout=10, allow_redirects=True)
+        return r.headers.get("Last-Modified")
+    except requests.RequestException:
+        return None
+
+def fetch_fred_data(series_id):
     url = f"https://fred.stlouisfed.org/graph/fredgraph.csv?id={series_id}"
+    path = FRED_CACHE_DIR / f"fred_{series_id}.parquet"
+    meta_path = path.with_suffix(".meta")
+
+    # 저장된 파일이 있을 때만 HEAD로 확인 -> Last-Modified가 같으면 CSV 다운로드/파싱 생략
+    if path.exists() and meta_path.exists():
+        last_modified = get_fred_last_modified(url)
+        if last_modified and meta_path.read_text() == last_modified:
+            try:
+                return pd.read_parquet(path)
+            except Exception as e:
+                pass
+
     try:
-        df = pd.read_csv(url, index_col=0, parse_dates=True, na_values='.')
+        r = get_http_session().get(url, timeout=10)
+        r.raise_for_status()
+
+        # PyArrow 엔진으로 파싱하고 값 컬럼은 float64로 바로 읽기
+        df = pd.read_csv(
+            io.BytesIO(r.content), index_col=0, parse_dates=[0], na_values='.',
+            dtype={series_id: "float64"}, engine="pyarrow"
+        )
         df.columns = [series_id] 
         df = df.dropna()
-        # ⭐ 수정됨: 2020년 -> 2000년으로 변경하여 장기 데이터 확보
-        df = df[df.index > '2000-01-01']
+        # ⭐ 수정됨: 2020년 -> 2000년으로 변경하여 장기 데이터 확보 (정렬된 인덱스라 loc 슬라이싱)
+        df = df.loc['2000-01-02':]
+
+        # 다음 실행을 위해 디스크에 저장 (실패해도 화면 표시는 계속)
+        # 서버가 Last-Modified를 주지 않으면 재검증이 불가능하므로 저장하지 않음
+        last_modified = r.headers.get("Last-Modified")
+        if last_modified:
+            try:
+                df.to_parquet(path, compression="zstd")
+                meta_path.write_text(last_modified)
+            except Exception as e:
+                pass
         return df
     except Exception as e:
         return None
 
-def create_sparkline_chart(data, color="red"):
+@st.cache_data(ttl=smart_ttl("fred_monthly"))
+def get_macro_data(series_id):
+    return fetch_fred_data(series_id)
+
+# x(날짜), y(값) 배열을 그대로 받아서 그림 (판다스 복사/변환 없음, NaN은 범위 계산에서 제외)
+def create_sparkline_chart(x_vals, y_vals, color="red"):
     fig = go.Figure()
-    y_vals = data.to_numpy().flatten()
-    y_min = float(y_vals.min())
-    y_max = float(y_vals.max())
+    y_min, y_max = float(np.nanmin(y_vals)), float(np.nanmax(y_vals))
     y_range = y_max - y_min
     buffer = y_range * 0.1 if y_range != 0 else 0.01 
     
+    # 90개짜리 작은 차트라 SVG(Scatter) 유지 - WebGL은 차트마다 컨텍스트를 잡아 모바일에서 한도 초과 위험
     fig.add_trace(go.Scatter(
-        x=data.index, y=y_vals, mode='lines', 
+        x=x_vals, y=y_vals, mode='lines', 
         line=dict(color=color, width=2), hoverinfo='x+y'
     ))
     
@@ -132,12 +290,15 @@ def create_sparkline_chart(data, color="red"):
     return fig
 
 # (3) 금/은 비율 및 주가 지수 데이터 가져오기 (새로 추가)
-@st.cache_data(ttl=3600)
-def get_ratio_data(period="5y"):
+# 금(GC=F), 은(SI=F), S&P500(^GSPC)
+RATIO_TICKERS = ("GC=F", "SI=F", "^GSPC")
+
+# session_key는 캐시 키 전용 (market_session_key 참고)
+@st.cache_data(ttl=smart_ttl("equity_closed"), max_entries=16)
+def get_ratio_data(session_key, period="5y"):
     try:
-        # 금(GC=F), 은(SI=F), S&P500(^GSPC) 데이터 다운로드
-        tickers = ["GC=F", "SI=F", "^GSPC"]
-        df = yf.download(tickers, period=period, progress=False, auto_adjust=True)
+        # 금/은/S&P500 데이터 다운로드
+        df = yf.download(list(RATIO_TICKERS), period=period, progress=False, auto_adjust=True)
         
         # 'Close' 컬럼만 선택 (멀티인덱스 처리)
         df = df['Close']
@@ -152,21 +313,42 @@ def get_ratio_data(period="5y"):
     except Exception as e:
         return None
 
+# (3-2) 전년 대비 상승률(YoY, %) - periods개 전 값과 나눠서 계산 (앞쪽 NaN 구간 없음)
+def yoy_pct(v, periods=12):
+    return (v[periods:] / v[:-periods] - 1.0) * 100.0
+
 # (4) 메인 매크로 차트 생성 함수 (버튼 추가)
+# 기간 선택 버튼 (Range Selector) - 매번 새로 만들 필요 없는 고정 설정
+MACRO_RANGESELECTOR = dict(
+    buttons=[
+        dict(count=1, label="1년", step="year", stepmode="backward"),
+        dict(count=5, label="5년", step="year", stepmode="backward"),
+        dict(count=10, label="10년", step="year", stepmode="backward"),
+        dict(step="all", label="전체")
+    ],
+    bgcolor="#f9f9f9", # 버튼 배경색
+    activecolor="#e5e5e5", # 선택된 버튼 색
+    font=dict(color="black")
+)
+
+# 오늘 날짜 기준 최근 5년 (기본 뷰 설정을 위해)
+def _default_range():
+    now = datetime.datetime.now()
+    return [now - datetime.timedelta(days=365*5), now]
+
 def create_macro_chart(df, col_name, title, color, target_line=None):
     fig = go.Figure()
-    y_vals = df[col_name].to_numpy().flatten()
+    y_vals = df[col_name].to_numpy(dtype=np.float64)
     
-    # ... (기존 y_min, y_max 계산 로직 동일) ...
-    y_min = float(y_vals.min())
-    y_max = float(y_vals.max())
+    # ... (기존 y_min, y_max 계산 로직 동일, NaN은 제외) ...
+    y_min, y_max = float(np.nanmin(y_vals)), float(np.nanmax(y_vals))
     if target_line is not None:
         y_min = min(y_min, target_line)
         y_max = max(y_max, target_line)
     y_range = y_max - y_min
     buffer = y_range * 0.1 if y_range != 0 else 0.1
 
-    fig.add_trace(go.Scatter(
+    fig.add_trace(go.Scattergl(
         x=df.index, y=y_vals, mode='lines', name=title,
         line=dict(color=color, width=3)
     ))
@@ -174,9 +356,6 @@ def create_macro_chart(df, col_name, title, color, target_line=None):
     if target_line is not None:
         fig.add_hline(y=target_line, line_dash="dash", line_color="green", annotation_text=f"Target ({target_line}%)")
 
-    # 오늘 날짜 기준 5년 전 계산 (기본 뷰 설정을 위해)
-    five_years_ago = datetime.datetime.now() - datetime.timedelta(days=365*5)
-
     fig.update_layout(
         title=title, height=350, margin=dict(l=20, r=20, t=60, b=20),
         yaxis=dict(range=[y_min - buffer, y_max + buffer], gridcolor='rgba(128,128,128,0.2)'),
@@ -186,20 +365,10 @@ def create_macro_chart(df, col_name, title, color, target_line=None):
             gridcolor='rgba(128,128,128,0.2)',
             
             # 1. 기간 선택 버튼 (Range Selector)
-            rangeselector=dict(
-                buttons=list([
-                    dict(count=1, label="1년", step="year", stepmode="backward"),
-                    dict(count=5, label="5년", step="year", stepmode="backward"),
-                    dict(count=10, label="10년", step="year", stepmode="backward"),
-                    dict(step="all", label="전체")
-                ]),
-                bgcolor="#f9f9f9", # 버튼 배경색
-                activecolor="#e5e5e5", # 선택된 버튼 색
-                font=dict(color="black")
-            ),
+            rangeselector=MACRO_RANGESELECTOR,
             
             # 2. 초기 화면은 최근 5년만 보여주기 (너무 길면 안 보이니까)
-            range=[five_years_ago, datetime.datetime.now()]
+            range=_default_range()
         ),
         
         paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)'   
@@ -293,6 +462,22 @@ def create_dual_axis_chart(df):
 
     return fig
 
+# (6) 차트 Figure 캐시 - 입력 데이터가 그대로면 Figure를 다시 만들지 않음
+# (st.plotly_chart는 Figure를 받으면 to_dict()만 하고 수정하지 않으므로 같은 객체를 공유해도 안전)
+# 긴 매크로 시계열은 전체를 해시하지 않고 (마지막 날짜, 길이, 마지막 값)만으로 캐시 키 생성
+CHART_HASH_FUNCS = {
+    pd.DataFrame: lambda df: (str(df.index[-1]), len(df), tuple(df.iloc[-1].tolist())),
+}
+
+# 스파크라인은 90개짜리 배열이라 그대로 해시
+@st.cache_resource(max_entries=32)
+def get_sparkline_figure(x_vals, y_vals, color="red"):
+    return create_sparkline_chart(x_vals, y_vals, color=color)
+
+@st.cache_resource(ttl=smart_ttl("fred_monthly"), hash_funcs=CHART_HASH_FUNCS, max_entries=16)
+def get_macro_chart_figure(df, col_name, title, color, target_line=None):
+    return create_macro_chart(df, col_name, title, color, target_line=target_line)
+
 # -----------------------------------------------------------------------------
 # 3. UI 구성: Section 1 - Market Pulse (Daily)
 # -----------------------------------------------------------------------------
@@ -314,35 +499,41 @@ metrics = {
 }
 
 metrics_list = list(metrics.items())
-data_summary = ""
+summary_lines = []  # 프롬프트에 들어갈 데이터 요약 (줄 단위로 모았다가 마지막에 한 번에 합침)
 
-# 4개씩 끊어서 두 줄(Row)로 표시
-for i in range(0, len(metrics_list), 4):
-    row_metrics = metrics_list[i:i+4]
-    cols = st.columns(4)
-    
-    for col, (name, info) in zip(cols, row_metrics):
+# 야후 티커는 한 번에 묶어서 다운로드 (^TNX는 FRED에서 따로 가져옴)
+bulk_tickers = tuple(info['ticker'] for info in metrics.values() if info['ticker'] != "^TNX")
+bulk_daily = get_bulk_daily(bulk_tickers, market_session_key(*bulk_tickers))
+
+# 8개를 한 번에 만들고 CSS Grid로 4개씩 두 줄(Row) 배치 (key로 그리드 CSS 범위 지정)
+with st.container(key="metric_grid"):
+    cols = st.columns(8)
+
+    for col, (name, info) in zip(cols, metrics_list):
         with col:
-            current, delta, history = get_daily_data(info['ticker'])
-            
+            current, delta, history = split_daily_data(bulk_daily, info['ticker'])
+            if current is None:
+                # ^TNX 이거나 일괄 다운로드에서 빠진 티커는 개별 요청으로 가져오기
+                current, delta, history = get_daily_data(info['ticker'])
+        
             if current is not None:
                 # 🌟 [추가됨] 등락률(%) 계산 로직
                 prev_price = current - delta
                 pct_change = 0
                 if prev_price != 0:
                     pct_change = (delta / prev_price) * 100
-                
+            
                 # 1. Delta 텍스트 만들기 (등락폭 + 퍼센트)
                 # 기본 포맷: "변동값 (퍼센트%)" -> 예: +5.20 (+1.5%)
                 delta_text = f"{delta:,.2f} ({pct_change:+.2f}%)"
-                
+            
                 if name == "😨 VIX (공포지수)":
                     daily_vol = current / 16
                     # VIX는 내용이 기니까 '예상변동'을 조금 짧게 줄여서 표시 (공간 확보)
                     delta_text = f"{delta:,.2f} (예상변동률 ±{daily_vol:.2f}%)"
-                    data_summary += f"- {name}: {current:,.2f} (등락: {pct_change:+.2f}%) -> [오늘예상변동: ±{daily_vol:.2f}%]\n"
+                    summary_lines.append(f"- {name}: {current:,.2f} (등락: {pct_change:+.2f}%) -> [오늘예상변동: ±{daily_vol:.2f}%]")
                 else:
-                    data_summary += f"- {name}: {current:,.2f}{info['suffix']} (전일대비: {delta:+.2f} / {pct_change:+.2f}%)\n"
+                    summary_lines.append(f"- {name}: {current:,.2f}{info['suffix']} (전일대비: {delta:+.2f} / {pct_change:+.2f}%)")
 
                 # 2. 메트릭 표시
                 st.metric(
@@ -350,19 +541,17 @@ for i in range(0, len(metrics_list), 4):
                     value=f"{current:,.2f}{info['suffix']}",
                     delta=delta_text
                 )
-                
+            
                 # 3. 차트 표시
                 line_color = '#ff4b4b' if delta > 0 else '#4b88ff'
-                fig = create_sparkline_chart(history.tail(90), color=line_color)
+                fig = get_sparkline_figure(
+                    history.index.values[-90:], history.to_numpy(dtype=np.float64)[-90:], color=line_color
+                )
                 # width='content'는 경고가 뜰 수 있으니 use_container_width=True 권장 (경고 무시 코드 넣으셨다면 OK)
                 st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
-                
+            
             else:
                 st.warning(f"{name} Load Fail")
-    
-    # 줄바꿈 간격
-    if i == 0 :
-        st.markdown("---")
 
 # -----------------------------------------------------------------------------
 # 4. UI 구성: Section 2 - Macro Health (Monthly)
@@ -371,63 +560,69 @@ st.markdown("---")
 st.subheader("거시경제 흐름")
 st.caption("지난 25년간의 장기 추세를 통해 현재 경제 사이클의 위치를 파악합니다.")
 
-# 1. 인플레이션 (CPI) 차트
-st.markdown("#### 📉 인플레이션 추이 (CPI YoY)")
-cpi_data = get_macro_data("CPIAUCSL")
+# 차트는 접어둔 상태로 시작 (펼칠 때 Plotly 렌더링, 요약 데이터는 항상 계산됨)
+with st.expander("📊 거시경제 흐름 차트 보기", expanded=False):
+    # 1. 인플레이션 (CPI) 차트
+    st.markdown("#### 📉 인플레이션 추이 (CPI YoY)")
+    cpi_data = get_macro_data("CPIAUCSL")
+
+    if cpi_data is not None:
+        # 전년 대비 상승률(YoY) 계산
+        cpi_yoy = pd.DataFrame(
+            {'CPIAUCSL': yoy_pct(cpi_data['CPIAUCSL'].to_numpy())},
+            index=cpi_data.index[12:]
+        )
 
-if cpi_data is not None:
-    # 전년 대비 상승률(YoY) 계산
-    cpi_yoy = cpi_data.pct_change(periods=12) * 100
-    
-    # 차트 그리기
-    fig_cpi = create_macro_chart(cpi_yoy, 'CPIAUCSL', "미국 소비자 물가 지수 (YoY)", '#ef553b', target_line=2.0)
-    st.plotly_chart(fig_cpi, use_container_width=True)
-    
-    # 요약 데이터 누적
-    last_cpi = cpi_yoy['CPIAUCSL'].iloc[-1]
-    data_summary += f"- 미국 소비자 물가 지수(CPI, YoY): {last_cpi:.2f}%\n"
-else:
-    st.warning("CPI 데이터 로드 실패")
+        # 차트 그리기
+        fig_cpi = get_macro_chart_figure(cpi_yoy, 'CPIAUCSL', "미국 소비자 물가 지수 (YoY)", '#ef553b', target_line=2.0)
+        st.plotly_chart(fig_cpi, use_container_width=True)
 
-# 차트 간 구분선
-st.divider()
+        # 요약 데이터 누적
+        last_cpi = cpi_yoy['CPIAUCSL'].iat[-1]
+        summary_lines.append(f"- 미국 소비자 물가 지수(CPI, YoY): {last_cpi:.2f}%")
+    else:
+        st.warning("CPI 데이터 로드 실패")
 
-# 2. 실업률 (Unemployment) 차트
-st.markdown("#### 🏭 고용지표 (실업률)")
-unrate_data = get_macro_data("UNRATE")
+    # 차트 간 구분선
+    st.divider()
 
-if unrate_data is not None:
-    # 차트 그리기
-    fig_unrate = create_macro_chart(unrate_data, 'UNRATE', "미국 실업률 (%)", '#ffa15a')
-    st.plotly_chart(fig_unrate, use_container_width=True)
-    
-    # 요약 데이터 누적
-    last_unrate = unrate_data['UNRATE'].iloc[-1]
-    data_summary += f"- 미국 실업률: {last_unrate:.2f}%\n"
-else:
-    st.warning("실업률 데이터 로드 실패")
+    # 2. 실업률 (Unemployment) 차트
+    st.markdown("#### 🏭 고용지표 (실업률)")
+    unrate_data = get_macro_data("UNRATE")
 
-st.divider()
+    if unrate_data is not None:
+        # 차트 그리기
+        fig_unrate = get_macro_chart_figure(unrate_data, 'UNRATE', "미국 실업률 (%)", '#ffa15a')
+        st.plotly_chart(fig_unrate, use_container_width=True)
 
-# 3. 금/은 비율 차트 (Risk Radar)
-st.markdown("#### ⚖️ 금/은 비율과 주가 (위기 감지)")
-st.caption("금/은 비율(점선)이 급등하는데 주가가 오르면 '거품' 혹은 '조정 임박' 신호일 수 있습니다.")
+        # 요약 데이터 누적
+        last_unrate = unrate_data['UNRATE'].iat[-1]
+        summary_lines.append(f"- 미국 실업률: {last_unrate:.2f}%")
+    else:
+        st.warning("실업률 데이터 로드 실패")
 
-ratio_data = get_ratio_data()
+    st.divider()
 
-if ratio_data is not None:
-    fig_ratio = create_dual_axis_chart(ratio_data)
-    st.plotly_chart(fig_ratio, use_container_width=True)
-    
-    # 최신 데이터 요약
-    last_ratio = ratio_data['Gold_Silver_Ratio'].iloc[-1]
-    prev_ratio = ratio_data['Gold_Silver_Ratio'].iloc[-2]
-    ratio_delta = last_ratio - prev_ratio
-    
-    data_summary += f"- 금/은 비율(Gold/Silver Ratio): {last_ratio:.2f} (전일대비: {ratio_delta:+.2f})\n"
-    data_summary += "  (참고: 금/은 비율이 80을 넘으면 경기 침체 우려, 급등 시 주식 시장 조정 가능성 높음)\n"
-else:
-    st.warning("금/은 비율 데이터 로드 실패")
+    # 3. 금/은 비율 차트 (Risk Radar)
+    st.markdown("#### ⚖️ 금/은 비율과 주가 (위기 감지)")
+    st.caption("금/은 비율(점선)이 급등하는데 주가가 오르면 '거품' 혹은 '조정 임박' 신호일 수 있습니다.")
+
+    ratio_data = get_ratio_data(market_session_key(*RATIO_TICKERS))
+
+    if ratio_data is not None:
+        fig_ratio = create_dual_axis_chart(ratio_data)
+        st.plotly_chart(fig_ratio, use_container_width=True)
+
+        # 최신 데이터 요약
+        ratio_vals = ratio_data['Gold_Silver_Ratio'].to_numpy()
+        last_ratio = ratio_vals[-1]
+        prev_ratio = ratio_vals[-2]
+        ratio_delta = last_ratio - prev_ratio
+
+        summary_lines.append(f"- 금/은 비율(Gold/Silver Ratio): {last_ratio:.2f} (전일대비: {ratio_delta:+.2f})")
+        summary_lines.append("  (참고: 금/은 비율이 80을 넘으면 경기 침체 우려, 급등 시 주식 시장 조정 가능성 높음)")
+    else:
+        st.warning("금/은 비율 데이터 로드 실패")
 
 
 # -----------------------------------------------------------------------------
@@ -440,8 +635,13 @@ st.info("아래 박스 우측 상단의 '복사' 버튼을 눌러 AI 서비스
 # 오늘 날짜
 today = datetime.datetime.now().strftime("%Y년 %m월 %d일")
 
-# 완성된 프롬프트 텍스트
-final_prompt = f"""
+# 데이터 요약 합치기
+data_summary = "\n".join(summary_lines) + "\n"
+
+# 완성된 프롬프트 텍스트 (날짜/데이터 요약이 그대로면 세션에 저장된 프롬프트 재사용)
+prompt_key = hash((today, data_summary))
+if st.session_state.get("prompt_key") != prompt_key:
+    st.session_state["prompt"] = f"""
 [역할]
 당신은 월가에서 20년 경력을 가진 거시경제 애널리스트이자, 나의 친절한 투자 멘토입니다.
 
@@ -460,6 +660,7 @@ final_prompt = f"""
 
 전문 용어를 쓰되 이해하기 쉽게 존대말로 설명해줘.
 """
+    st.session_state["prompt_key"] = prompt_key
 
 # 코드 블록으로 표시하여 원클릭 복사 지원
-st.code(final_prompt, language="text")
\ No newline at end of file
+st.code(st.session_state["prompt"], language="text")
\ No newline at end of file